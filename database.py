@@ -1,9 +1,11 @@
 import sqlite3
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Tuple, Optional
 import time
 
 # Veritabanı dosyasının adı
 DB_NAME = 'trades.db'
+# Hesap adı verilmeyen (tekli bot) işlemler bu isimle kaydedilir
+DEFAULT_ACCOUNT = 'default'
 
 def create_connection():
     """Veritabanı bağlantısı oluşturur veya mevcut olana bağlanır."""
@@ -28,9 +30,14 @@ def init_db():
                     trade_id INTEGER UNIQUE NOT NULL,
                     side TEXT NOT NULL,
                     pnl REAL NOT NULL,
-                    timestamp INTEGER NOT NULL
+                    timestamp INTEGER NOT NULL,
+                    account TEXT NOT NULL DEFAULT 'default'
                 );
             """)
+            # Eski veritabanlarına hesap sütununu ekle
+            columns = [row[1] for row in cursor.execute("PRAGMA table_info(trades)")]
+            if 'account' not in columns:
+                cursor.execute("ALTER TABLE trades ADD COLUMN account TEXT NOT NULL DEFAULT 'default'")
             conn.commit()
             print("Veritabanı tablosu başarıyla kontrol edildi/oluşturuldu.")
         except sqlite3.Error as e:
@@ -42,8 +49,8 @@ def add_trade(trade_data: Dict[str, Any]):
     """Veritabanına yeni bir tamamlanmış işlem ekler."""
     conn = create_connection()
     if conn is not None:
-        sql = ''' INSERT OR IGNORE INTO trades(symbol, trade_id, side, pnl, timestamp)
-                  VALUES(?,?,?,?,?) '''
+        sql = ''' INSERT OR IGNORE INTO trades(symbol, trade_id, side, pnl, timestamp, account)
+                  VALUES(?,?,?,?,?,?) '''
         try:
             cursor = conn.cursor()
             cursor.execute(sql, (
@@ -51,7 +58,8 @@ def add_trade(trade_data: Dict[str, Any]):
                 int(trade_data['id']),
                 trade_data['side'],
                 float(trade_data['realizedPnl']),
-                int(trade_data['time'])
+                int(trade_data['time']),
+                trade_data.get('account') or DEFAULT_ACCOUNT
             ))
             conn.commit()
         except sqlite3.Error as e:
@@ -59,14 +67,17 @@ def add_trade(trade_data: Dict[str, Any]):
         finally:
             conn.close()
 
-def get_all_trades() -> List[Tuple]:
-    """Tüm işlem kayıtlarını veritabanından en yeniden eskiye doğru çeker."""
+def get_all_trades(account: Optional[str] = None) -> List[Tuple]:
+    """İşlem kayıtlarını (hesap verilirse yalnızca o hesabın) en yeniden eskiye doğru çeker."""
     conn = create_connection()
     if conn is not None:
         try:
             cursor = conn.cursor()
             # Sütun sırasını kodlarımızla uyumlu hale getiriyoruz
-            cursor.execute("SELECT id, symbol, trade_id, side, pnl, timestamp FROM trades ORDER BY timestamp DESC")
+            if account is None:
+                cursor.execute("SELECT id, symbol, trade_id, side, pnl, timestamp FROM trades ORDER BY timestamp DESC")
+            else:
+                cursor.execute("SELECT id, symbol, trade_id, side, pnl, timestamp FROM trades WHERE account = ? ORDER BY timestamp DESC", (account,))
             rows = cursor.fetchall()
             return rows
         except sqlite3.Error as e:
@@ -76,9 +87,28 @@ def get_all_trades() -> List[Tuple]:
             conn.close()
     return []
 
-def calculate_stats() -> Dict[str, Any]:
-    """Veritabanındaki verilere göre performans istatistikleri hesaplar."""
-    trades = get_all_trades()
+def get_last_trade_time(account: Optional[str] = None) -> Optional[int]:
+    """Hesabın (verilmezse tüm hesapların) en son kaydedilen işlem zamanını döndürür."""
+    conn = create_connection()
+    if conn is not None:
+        try:
+            cursor = conn.cursor()
+            if account is None:
+                cursor.execute("SELECT MAX(timestamp) FROM trades")
+            else:
+                cursor.execute("SELECT MAX(timestamp) FROM trades WHERE account = ?", (account,))
+            row = cursor.fetchone()
+            return row[0] if row else None
+        except sqlite3.Error as e:
+            print(f"Son işlem zamanı getirme hatası: {e}")
+            return None
+        finally:
+            conn.close()
+    return None
+
+def calculate_stats(account: Optional[str] = None) -> Dict[str, Any]:
+    """Veritabanındaki verilere göre (hesap verilirse yalnızca o hesap için) performans istatistikleri hesaplar."""
+    trades = get_all_trades(account)
     if not trades:
         return {"total_pnl": 0, "win_rate": 0, "total_trades": 0, "wins": 0, "losses": 0}
 
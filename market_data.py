@@ -0,0 +1,121 @@
+import time
+import pandas as pd
+from typing import Callable, Optional, List, Dict, Any, Tuple
+from binance.client import Client
+
+# Binance kline aralık birimlerinin milisaniye karşılıkları
+INTERVAL_UNITS_MS = {'m': 60_000, 'h': 3_600_000, 'd': 86_400_000, 'w': 604_800_000}
+
+
+def interval_ms(timeframe: str) -> int:
+    """'5m', '1h' gibi bir zaman dilimini milisaniyeye çevirir."""
+    return int(timeframe[:-1]) * INTERVAL_UNITS_MS[timeframe[-1]]
+
+
+KLINE_COLUMNS = [
+    'timestamp', 'open', 'high', 'low', 'close', 'volume',
+    'close_time', 'quote_asset_volume', 'number_of_trades',
+    'taker_buy_base_asset_volume', 'taker_buy_quote_asset_volume', 'ignore']
+
+
+class MarketDataHub:
+    """
+    Herkese açık piyasa verisini (kline, mark price) tek bir multiplex socket üzerinden
+    bir kez dinleyen ve mum geçmişini bellekte tutan veri dağıtıcısı.
+
+    Geçmiş yalnızca başlangıçta REST ile çekilir; sonrasında kapanan mumlar akıştan
+    eklenir. Böylece piyasa verisi maliyeti hesap sayısıyla artmaz.
+    """
+
+    def __init__(self, client: Client, log: Optional[Callable] = None, history_limit: int = 200):
+        self.client = client
+        self.history_limit = history_limit
+        self._log = log if log else lambda msg: print(msg)
+        self.history: Dict[Tuple[str, str], List[list]] = {}
+
+    def subscribe(self, symbol: str, timeframe: str):
+        self.history.setdefault((symbol, timeframe), [])
+
+    def load_history(self):
+        """Abone olunan her sembol/zaman dilimi için kapanmış mum geçmişini bir kez çeker."""
+        for (symbol, timeframe) in self.history:
+            try:
+                klines = self.client.futures_klines(symbol=symbol, interval=timeframe, limit=self.history_limit)
+                # Henüz kapanmamış mum atlanır, akıştan gelecek kapanışla eklenecek
+                now_ms = int(time.time() * 1000)
+                self.history[(symbol, timeframe)] = [list(k) for k in klines if k[6] < now_ms]
+            except Exception as e:
+                self._log(f"HATA: Piyasa verileri çekilemedi ({symbol}): {e}")
+
+    def streams(self) -> List[str]:
+        names = []
+        for (symbol, timeframe) in self.history:
+            names.append(f"{symbol.lower()}@kline_{timeframe}")
+        for symbol in sorted({symbol for (symbol, _) in self.history}):
+            names.append(f"{symbol.lower()}@markPrice@1s")
+        return names
+
+    def on_closed_kline(self, k: Dict[str, Any]) -> Optional[pd.DataFrame]:
+        """Kapanan mumu geçmişe ekler ve güncel DataFrame'i döndürür."""
+        key = (k['s'], k['i'])
+        rows = self.history.get(key)
+        if rows is None:
+            return None
+        row = [k['t'], k['o'], k['h'], k['l'], k['c'], k['v'], k['T'], k['q'], k['n'], k['V'], k['Q'], '0']
+        if rows and rows[-1][0] == k['t']:
+            rows[-1] = row
+        else:
+            rows.append(row)
+        del rows[:-self.history_limit]
+        return self.frame(k['s'], k['i'])
+
+    def frame(self, symbol: str, timeframe: str) -> Optional[pd.DataFrame]:
+        """
+        Geçmişi stratejilerin beklediği formatta DataFrame olarak döndürür.
+
+        Stratejiler son satırı açık mum kabul edip `iloc[-2]` ile çalıştığından, REST
+        cevabıyla aynı şekli korumak için sona yeni mumun yer tutucusu eklenir.
+        """
+        rows = self.history.get((symbol, timeframe))
+        if not rows:
+            return None
+        last = rows[-1]
+        next_open = last[6] + 1
+        placeholder = [next_open, last[4], last[4], last[4], last[4], '0', next_open, '0', 0, '0', '0', '0']
+        df = pd.DataFrame(rows + [placeholder], columns=KLINE_COLUMNS)
+        df[['open', 'high', 'low', 'close', 'volume']] = df[['open', 'high', 'low', 'close', 'volume']].apply(pd.to_numeric, errors='coerce')
+        return df
+
+    def is_fresh(self, symbol: str, timeframe: str) -> bool:
+        """Son kapanmış mum, şu andan en fazla bir aralık önce mi kapandı?"""
+        rows = self.history.get((symbol, timeframe))
+        if not rows:
+            return False
+        return int(time.time() * 1000) - rows[-1][6] <= interval_ms(timeframe)
+
+    def backfill(self) -> List[Tuple[str, str]]:
+        """
+        Bağlantı kesintisi sırasında kaçırılan kapanmış mumları çeker. Yalnızca son
+        bilinen mumdan sonraki aralık istenir.
+
+        Returns:
+            List[Tuple[str, str]]: Yeni kapanmış mum eklenen (sembol, zaman dilimi) çiftleri.
+        """
+        updated = []
+        now_ms = int(time.time() * 1000)
+        for (symbol, timeframe), rows in self.history.items():
+            if not rows:
+                continue
+            try:
+                klines = self.client.futures_klines(symbol=symbol, interval=timeframe, startTime=rows[-1][0] + 1)
+            except Exception as e:
+                self._log(f"HATA: Eksik mumlar çekilemedi ({symbol}): {e}")
+                continue
+            closed = [list(k) for k in klines if k[6] < now_ms]
+            if not closed:
+                continue
+            rows.extend(closed)
+            del rows[:-self.history_limit]
+            self._log(f"{symbol} ({timeframe}) için {len(closed)} eksik mum tamamlandı.")
+            updated.append((symbol, timeframe))
+        return updated
@@ -0,0 +1,160 @@
+import asyncio
+import configparser
+import pandas as pd
+from typing import Callable, Optional, List, Dict, Any, Tuple
+from binance.client import Client
+from binance import BinanceSocketManager
+from trading_bot import TradingBot, compute_signal
+from market_data import MarketDataHub
+from stream_supervisor import StreamSupervisor
+from risk import fetch_symbol_filters
+
+
+class BotOrchestrator:
+    """
+    Birden fazla API anahtarını ([ACCOUNT_*] bölümleri) tek bir süreçte çalıştırır.
+
+    Piyasa verisi ve sinyaller her sembol/strateji için bir kez hesaplanır ve aynı
+    sembolü işleyen tüm hesaplara dağıtılır; her hesabın yalnızca kendi kullanıcı
+    veri akışı ve emir yolu vardır.
+    """
+
+    def __init__(self, log_callback: Optional[Callable] = None,
+                 ui_update_callback: Optional[Callable] = None,
+                 status_callback: Optional[Callable] = None):
+        self.log_callback = log_callback
+        self.ui_update_callback = ui_update_callback
+        self.status_callback = status_callback
+        self._log = self.log_callback if self.log_callback else lambda msg: print(msg)
+
+        self.config = self._load_config()
+        self.is_testnet = self.config.getboolean('BINANCE', 'testnet', fallback=False)
+
+        account_sections = [name for name in self.config.sections() if name.startswith('ACCOUNT_')]
+        if not account_sections:
+            raise ValueError("HATA: config.ini içinde [ACCOUNT_*] bölümü bulunamadı.")
+        self.bots: List[TradingBot] = [
+            TradingBot(log_callback, ui_update_callback, status_callback, account=self.config[name])
+            for name in account_sections
+        ]
+
+        # Herkese açık veriler için anahtarsız tek istemci
+        self.client = Client(None, None, testnet=self.is_testnet)
+        self.bm = BinanceSocketManager(self.client)
+        ping_interval = self.config.getfloat('BINANCE', 'stream_ping_interval', fallback=0.5)
+        self.bm.ws_kwargs.update(ping_interval=ping_interval, ping_timeout=ping_interval)
+        self.hub = MarketDataHub(self.client, log=self._log)
+
+        # Tick/step filtreleri herkese açık veridir; tüm hesaplar tek bir kopyayı paylaşır
+        self.symbol_filters: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        for bot in self.bots:
+            bot.risk.symbol_filters = self.symbol_filters
+
+        # (sembol, zaman dilimi) -> o mumla çalışan strateji adları
+        self.strategies: Dict[Tuple[str, str], List[str]] = {}
+        for bot in self.bots:
+            timeframe = self.config[f"STRATEGY_{bot.active_strategy_name}"]['timeframe']
+            self.hub.subscribe(bot.active_symbol, timeframe)
+            names = self.strategies.setdefault((bot.active_symbol, timeframe), [])
+            if bot.active_strategy_name not in names:
+                names.append(bot.active_strategy_name)
+
+        self.active: bool = False
+        self.loop = None
+        self._log(f"Orkestratör {len(self.bots)} hesap ile oluşturuldu.")
+
+    def start(self):
+        if self.active:
+            self._log("Orkestratör zaten çalışıyor.")
+            return
+        self.active = True
+        for bot in self.bots:
+            bot.strategy_active = True
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_until_complete(self.run())
+        self._log("Orkestratör döngüsü sonlandı.")
+
+    def stop(self):
+        if not self.active:
+            self._log("Orkestratör zaten durdurulmuş.")
+            return
+        self.active = False
+        for bot in self.bots:
+            bot.strategy_active = False
+        if self.loop and self.loop.is_running():
+            self.loop.call_soon_threadsafe(self.loop.stop)
+        self._log("Orkestratör durduruldu.")
+
+    async def run(self):
+        self.hub.load_history()
+        try:
+            self.symbol_filters.update(fetch_symbol_filters(self.client, {bot.active_symbol for bot in self.bots}))
+        except Exception as e:
+            self._log(f"HATA: Borsa kuralları çekilemedi: {e}")
+        for bot in self.bots:
+            # Filtreler paylaşılır; hesap başına yalnızca kaldıraç ayarlanır
+            bot.risk.prepare(bot.active_symbol, bot.leverage)
+            bot._track_existing_position()
+
+        is_active = lambda: self.active
+        market_supervisor = StreamSupervisor(
+            "PİYASA",
+            socket_factory=lambda: self.bm.futures_multiplex_socket(self.hub.streams()),
+            handler=self._process_market_message,
+            is_active=is_active,
+            log=self._log,
+            heartbeat_timeout=self.config.getfloat('BINANCE', 'stream_heartbeat_timeout', fallback=1.5),
+            on_reconnect=self._backfill_market_data
+        )
+        await asyncio.gather(
+            market_supervisor.run(),
+            *(bot.user_stream_supervisor(is_active).run() for bot in self.bots)
+        )
+
+    async def _process_market_message(self, msg: Dict[str, Any]):
+        data = msg.get('data', msg)
+        event_type = data.get('e')
+        if event_type == 'markPriceUpdate':
+            for bot in self.bots:
+                if bot.active_symbol == data['s']:
+                    await bot._process_mark_price_message(data)
+        elif event_type == 'kline' and data['k'].get('x'):
+            k = data['k']
+            self._log(f"Yeni mum kapandı: {k['s']} ({k['i']})")
+            await self._dispatch_signals(k['s'], k['i'], self.hub.on_closed_kline(k))
+
+    async def _backfill_market_data(self):
+        """
+        Kesinti sırasında kapanan mumları tamamlar. En son kapanan mumun sinyali yalnızca
+        mum bir aralıktan daha yeniyse dağıtılır; aksi halde sadece geçmiş güncellenir.
+        """
+        for symbol, timeframe in await self.loop.run_in_executor(None, self.hub.backfill):
+            if not self.hub.is_fresh(symbol, timeframe):
+                self._log(f"{symbol} ({timeframe}) için son kapanan mum bir aralıktan eski, sinyal dağıtılmıyor.")
+                continue
+            await self._dispatch_signals(symbol, timeframe, self.hub.frame(symbol, timeframe))
+
+    async def _dispatch_signals(self, symbol: str, timeframe: str, df: Optional[pd.DataFrame]):
+        if df is None or df.empty: return
+        price = float(df['close'].iloc[-2])
+
+        jobs = []
+        for strategy_name in self.strategies.get((symbol, timeframe), []):
+            # Stratejiler DataFrame'e sütun eklediği için her biri kendi kopyasıyla çalışır
+            signal, atr_value = compute_signal(self.config, strategy_name, df.copy())
+            self._log(f"[{symbol}] {strategy_name} sinyali: {signal}")
+            for bot in self.bots:
+                if bot.active_symbol == symbol and bot.active_strategy_name == strategy_name:
+                    jobs.append(self.loop.run_in_executor(None, bot.handle_signal, signal, atr_value, price))
+        # Emir gönderimleri hesaplar arasında paralel yürütülür
+        if jobs: await asyncio.gather(*jobs)
+
+    def _load_config(self) -> configparser.ConfigParser:
+        parser = configparser.ConfigParser()
+        parser.read('config.ini', encoding='utf-8')
+        return parser
+
+
+if __name__ == '__main__':
+    BotOrchestrator().start()
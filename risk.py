@@ -0,0 +1,222 @@
+import math
+import configparser
+from decimal import Decimal, ROUND_FLOOR, ROUND_HALF_UP
+from dataclasses import dataclass
+from typing import Callable, Optional, Dict, List, Any
+
+
+@dataclass(frozen=True, slots=True)
+class SymbolRules:
+    """Sinyal anında REST çağrısı yapmamak için önceden hesaplanan sembol sabitleri."""
+    symbol: str
+    tick_size: Decimal
+    step_size: Decimal
+    min_qty: float
+    min_notional: float
+    price_decimals: int
+    qty_decimals: int
+    leverage: int
+
+
+@dataclass(frozen=True, slots=True)
+class RiskPlan:
+    """Tek bir giriş için hesaplanmış miktar, TP/SL ve marj bilgisi."""
+    symbol: str
+    side: str
+    close_side: str
+    quantity: float
+    entry_price: float
+    tp_price: float
+    sl_price: float
+    margin: float
+
+
+def _decimals(step: Decimal) -> int:
+    """Borsanın verdiği adım değerinin ('0.05', '0.0010') ondalık basamak sayısını döndürür."""
+    return max(0, -step.normalize().as_tuple().exponent)
+
+
+def _to_step(value: float, step: Decimal, rounding: str) -> Decimal:
+    """Değeri adımın tam katına yuvarlar; ondalık basamak adımın kendisinden gelir."""
+    return (Decimal(str(value)) / step).to_integral_value(rounding=rounding) * step
+
+
+def fetch_symbol_filters(client, symbols) -> Dict[str, Dict[str, Dict[str, Any]]]:
+    """
+    Verilen semboller için borsa filtrelerini tek bir exchange_info isteğiyle çeker.
+    Herkese açık veri olduğundan birden fazla hesap aynı sonucu paylaşabilir.
+
+    Returns:
+        Dict: sembol -> filterType -> filtre sözlüğü
+    """
+    info = client.futures_exchange_info()
+    return {
+        s['symbol']: {f['filterType']: f for f in s.get('filters', [])}
+        for s in info['symbols'] if s['symbol'] in symbols
+    }
+
+
+class RiskManager:
+    """
+    'atr' ve 'fixed_roi' risk modlarını ve volatiliteye göre pozisyon boyutlandırmayı
+    uygulayan risk modülü.
+
+    Borsa kuralları (tick/step, minimum miktar) ve kaldıraç `prepare` ile bir kez
+    yüklenir; `plan` yalnızca aritmetik işlem yapar ve REST çağrısı içermez.
+    """
+
+    def __init__(self, client, config: configparser.ConfigParser, strategy_name: str,
+                 log: Optional[Callable] = None, quantity_usd: Optional[float] = None):
+        self.client = client
+        self.config = config
+        self.strategy_name = strategy_name
+        # Hesap bazlı miktar verilmişse [TRADING] quantity_usd yerine kullanılır
+        self._quantity_override = quantity_usd
+        self._log = log if log else lambda msg: print(msg)
+        self.rules: Dict[str, SymbolRules] = {}
+        # Orkestratör birden fazla hesap için tek bir paylaşılan sözlük atayabilir
+        self.symbol_filters: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self.reload()
+
+    def reload(self):
+        """Config'deki risk parametrelerini yeniden okur (ayarlar değiştiğinde çağrılır)."""
+        trading = self.config['TRADING']
+        strategy_config = self.config[f"STRATEGY_{self.strategy_name}"]
+
+        self.mode = trading.get('risk_management_mode', 'atr').strip().lower()
+        self.quantity_usd = self._quantity_override if self._quantity_override is not None else float(trading['quantity_usd'])
+        self.fixed_roi_tp = float(trading.get('fixed_roi_tp', 2.0))
+        self.fixed_roi_sl = float(trading.get('fixed_roi_sl', self.fixed_roi_tp / 2))
+        self.sizing_mode = trading.get('sizing_mode', 'fixed').strip().lower()
+        self.target_volatility = float(trading.get('target_volatility_percent', 0.5))
+        self.max_size_multiplier = float(trading.get('max_size_multiplier', 2.0))
+
+        self.sl_multiplier = float(strategy_config['atr_multiplier_sl'])
+        self.tp_multiplier = float(strategy_config.get('atr_multiplier_tp', self.sl_multiplier * 2))
+
+    def prepare(self, symbol: str, leverage: int) -> Optional[SymbolRules]:
+        """
+        Sembolün borsa kurallarını (paylaşılan önbellekte yoksa) çeker, kaldıracı bu
+        hesap için ayarlar ve sonucu önbelleğe alır.
+        """
+        cached = self.rules.get(symbol)
+        if cached and cached.leverage == leverage:
+            return cached
+        try:
+            if symbol not in self.symbol_filters:
+                self.symbol_filters.update(fetch_symbol_filters(self.client, {symbol}))
+            filters = self.symbol_filters.get(symbol)
+            if filters is None:
+                self._log(f"HATA: {symbol} için borsa kuralları bulunamadı.")
+                return None
+            tick_size = Decimal(filters['PRICE_FILTER']['tickSize'])
+            step_size = Decimal(filters['LOT_SIZE']['stepSize'])
+            min_qty = float(filters['LOT_SIZE']['minQty'])
+            min_notional = float(filters.get('MIN_NOTIONAL', {}).get('notional', 0))
+
+            self.client.futures_change_leverage(symbol=symbol, leverage=leverage)
+
+            rules = SymbolRules(
+                symbol=symbol, tick_size=tick_size, step_size=step_size,
+                min_qty=min_qty, min_notional=min_notional,
+                price_decimals=_decimals(tick_size), qty_decimals=_decimals(step_size),
+                leverage=leverage
+            )
+            self.rules[symbol] = rules
+            self._log(f"Risk kuralları yüklendi: {symbol} | tick: {tick_size} | step: {step_size} | {leverage}x")
+            return rules
+        except Exception as e:
+            self._log(f"HATA: Risk kuralları yüklenemedi ({symbol}): {e}")
+            return None
+
+    def plan(self, symbol: str, side: str, price: float, atr: float) -> Optional[RiskPlan]:
+        """
+        Verilen fiyat ve ATR ile miktar, TP ve SL seviyelerini hesaplar.
+
+        Args:
+            symbol (str): İşlem sembolü.
+            side (str): 'BUY' veya 'SELL'.
+            price (float): Tahmini giriş fiyatı (son kapanış).
+            atr (float): Sinyal mumundaki ATR değeri.
+
+        Returns:
+            Optional[RiskPlan]: Kurallar yüklenmemişse veya miktar yetersizse None.
+        """
+        rules = self.rules.get(symbol)
+        if rules is None or price <= 0:
+            return None
+        direction = 1 if side == 'BUY' else -1
+
+        if self.mode == 'fixed_roi':
+            # ROI yüzdesini kaldıraca bölerek fiyat hareketine çevir
+            tp_distance = price * self.fixed_roi_tp / 100 / rules.leverage
+            sl_distance = price * self.fixed_roi_sl / 100 / rules.leverage
+        else:
+            # Kısa geçmişte pandas_ta ATR'yi NaN döndürür
+            if not math.isfinite(atr) or atr <= 0:
+                return None
+            tp_distance = atr * self.tp_multiplier
+            sl_distance = atr * self.sl_multiplier
+
+        notional = self.quantity_usd
+        if self.sizing_mode == 'volatility' and math.isfinite(atr) and atr > 0:
+            atr_percent = atr / price * 100
+            notional *= min(self.max_size_multiplier, self.target_volatility / atr_percent)
+
+        quantity = float(_to_step(notional / price, rules.step_size, ROUND_FLOOR))
+        if quantity < rules.min_qty or quantity * price < rules.min_notional:
+            return None
+
+        return RiskPlan(
+            symbol=symbol,
+            side=side,
+            close_side='SELL' if side == 'BUY' else 'BUY',
+            quantity=quantity,
+            entry_price=price,
+            tp_price=self.round_price(symbol, price + direction * tp_distance),
+            sl_price=self.round_price(symbol, price - direction * sl_distance),
+            margin=quantity * price / rules.leverage
+        )
+
+    def build_batch_orders(self, plan: RiskPlan) -> List[Dict[str, Any]]:
+        """Giriş, TP ve SL emirlerini tek bir batch isteği için hazırlar."""
+        return [
+            {
+                'symbol': plan.symbol,
+                'side': plan.side,
+                'type': 'MARKET',
+                'quantity': self.format_quantity(plan.symbol, plan.quantity)
+            },
+            {
+                'symbol': plan.symbol,
+                'side': plan.close_side,
+                'type': 'TAKE_PROFIT_MARKET',
+                'stopPrice': self.format_price(plan.symbol, plan.tp_price),
+                'closePosition': True
+            },
+            {
+                'symbol': plan.symbol,
+                'side': plan.close_side,
+                'type': 'STOP_MARKET',
+                'stopPrice': self.format_price(plan.symbol, plan.sl_price),
+                'closePosition': True
+            }
+        ]
+
+    def round_price(self, symbol: str, price: float) -> float:
+        rules = self.rules.get(symbol)
+        if rules is None:
+            return price
+        return float(_to_step(price, rules.tick_size, ROUND_HALF_UP))
+
+    def format_price(self, symbol: str, price: float) -> str:
+        rules = self.rules.get(symbol)
+        if rules is None:
+            return f"{price:.5f}"
+        return f"{self.round_price(symbol, price):.{rules.price_decimals}f}"
+
+    def format_quantity(self, symbol: str, quantity: float) -> str:
+        rules = self.rules.get(symbol)
+        if rules is None:
+            return f"{quantity:.4f}"
+        return f"{quantity:.{rules.qty_decimals}f}"
@@ -0,0 +1,117 @@
+import asyncio
+import random
+from typing import Callable, Optional, Awaitable, Dict, Any
+
+# Bu olaylar bağlantının artık kullanılamadığını gösterir, socket yeniden açılır
+RECONNECT_EVENTS = ('error', 'listenKeyExpired')
+
+
+class StreamSupervisor:
+    """
+    Tek bir websocket akışını ayakta tutan denetçi.
+
+    - Kalp atışı zaman aşımı: `heartbeat_timeout` saniye boyunca mesaj gelmezse
+      akış takılmış kabul edilir ve socket yeniden açılır.
+    - Yeniden bağlanma: ilk deneme hemen, sonrakiler jitter'lı üstel bekleme ile yapılır.
+    - Keepalive: verilirse `keepalive` fonksiyonu bağlantı açıkken `keepalive_interval`
+      saniyede bir çağrılır (örn. listen key yenileme).
+    - Yeniden bağlandıktan sonra `on_reconnect` çağrılır (eksik mumlar, hesap durumu).
+
+    `socket_factory` event loop üzerinde çağrılır (python-binance socket'leri oluşturuldukları
+    thread'in loop'una bağlanır); bloklayan REST hazırlığı varsa `prepare` ile executor'da yapılır.
+    """
+
+    def __init__(self, name: str,
+                 socket_factory: Callable[[], Any],
+                 handler: Callable[[Dict[str, Any]], Awaitable[None]],
+                 is_active: Callable[[], bool],
+                 log: Optional[Callable] = None,
+                 prepare: Optional[Callable[[], None]] = None,
+                 heartbeat_timeout: Optional[float] = None,
+                 keepalive: Optional[Callable[[], None]] = None,
+                 keepalive_interval: float = 30 * 60,
+                 on_reconnect: Optional[Callable[[], Awaitable[None]]] = None,
+                 base_delay: float = 0.1,
+                 max_delay: float = 5.0):
+        self.name = name
+        self.socket_factory = socket_factory
+        self.handler = handler
+        self.is_active = is_active
+        self.prepare = prepare
+        self.heartbeat_timeout = heartbeat_timeout
+        self.keepalive = keepalive
+        self.keepalive_interval = keepalive_interval
+        self.on_reconnect = on_reconnect
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._log = log if log else lambda msg: print(msg)
+        self.reconnects = 0
+
+    async def run(self):
+        attempt = 0
+        connected_before = False
+        while self.is_active():
+            keepalive_task = None
+            try:
+                if self.prepare:
+                    await asyncio.get_running_loop().run_in_executor(None, self.prepare)
+                socket = self.socket_factory()
+                async with socket as stream:
+                    if connected_before:
+                        self.reconnects += 1
+                        self._log(f"{self.name} akışı yeniden bağlandı.")
+                        if self.on_reconnect: await self.on_reconnect()
+                    connected_before = True
+                    if self.keepalive:
+                        keepalive_task = asyncio.create_task(self._keepalive_loop())
+                    # Bekleme süresi ancak bağlantı gerçekten veri taşıdıysa sıfırlanır
+                    if await self._receive(stream):
+                        attempt = 0
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._log(f"{self.name} STREAM HATASI: {e}")
+            finally:
+                if keepalive_task: keepalive_task.cancel()
+
+            if not self.is_active(): break
+            delay = self._backoff(attempt)
+            attempt += 1
+            self._log(f"{self.name} akışı {delay:.2f} sn içinde yeniden bağlanacak...")
+            await asyncio.sleep(delay)
+
+    async def _receive(self, stream) -> int:
+        """Bağlantı kopana veya takılana kadar mesajları işler, işlenen mesaj sayısını döndürür."""
+        received = 0
+        while self.is_active():
+            try:
+                msg = await asyncio.wait_for(stream.recv(), timeout=self.heartbeat_timeout)
+            except asyncio.TimeoutError:
+                self._log(f"{self.name} akışında {self.heartbeat_timeout} sn boyunca veri yok, bağlantı yenileniyor.")
+                return received
+            if msg is None:
+                continue
+            data = msg.get('data', msg)
+            if data.get('e') in RECONNECT_EVENTS:
+                self._log(f"{self.name} akışı kapandı: {data.get('m', data.get('e'))}")
+                return received
+            received += 1
+            try:
+                await self.handler(msg)
+            except Exception as e:
+                # İşleme hataları bağlantıyı koparmaz
+                self._log(f"{self.name} mesaj işleme hatası: {e}")
+        return received
+
+    async def _keepalive_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.keepalive_interval)
+            try:
+                await loop.run_in_executor(None, self.keepalive)
+            except Exception as e:
+                self._log(f"{self.name} keepalive hatası: {e}")
+
+    def _backoff(self, attempt: int) -> float:
+        """İlk denemede ~0.1 sn, sonrasında üstel artan ve jitter'lı bekleme süresi."""
+        return min(self.max_delay, self.base_delay * (2 ** attempt)) * random.uniform(0.5, 1.0)
@@ -13,21 +13,44 @@ import strategy          # KadirV2 stratejisi için
 import strategy_scalper  # Scalper stratejisi için
 import database
 import pandas_ta as ta
+from trailing_stop import TrailingStopManager
+from risk import RiskManager
+from market_data import MarketDataHub
+from stream_supervisor import StreamSupervisor
+
+def compute_signal(config: configparser.ConfigParser, strategy_name: str, df: pd.DataFrame) -> tuple:
+    """Seçili stratejinin sinyalini ve ATR değerini hesaplar."""
+    if strategy_name.lower() == 'scalper':
+        return strategy_scalper.get_signal(df, config['STRATEGY_Scalper'])
+    else:
+        return strategy.get_signal(df, config['STRATEGY_KadirV2'])
 
 class TradingBot:
     def __init__(self, log_callback: Optional[Callable] = None, 
                  ui_update_callback: Optional[Callable] = None,
-                 status_callback: Optional[Callable] = None):
+                 status_callback: Optional[Callable] = None,
+                 account: Optional[configparser.SectionProxy] = None):
+        """
+        Args:
+            account (Optional[configparser.SectionProxy]): Orkestratör tarafından çalıştırılan
+                hesaplar için [ACCOUNT_*] bölümü. Verilirse API anahtarları bu bölümdeki
+                ortam değişkeni adlarından okunur; sembol, strateji, kaldıraç ve miktar
+                [TRADING] değerlerinin üzerine yazılır.
+        """
         self.log_callback = log_callback
         self.ui_update_callback = ui_update_callback
         self.status_callback = status_callback
 
-        self._log = self.log_callback if self.log_callback else lambda msg: print(msg)
+        self.account_name = account.name.replace('ACCOUNT_', '', 1) if account is not None else None
+        base_log = self.log_callback if self.log_callback else lambda msg: print(msg)
+        self._log = (lambda msg: base_log(f"[{self.account_name}] {msg}")) if self.account_name else base_log
 
         self.config = self._load_config()
 
-        api_key = os.environ.get('BINANCE_API_KEY')
-        api_secret = os.environ.get('BINANCE_API_SECRET')
+        key_env = account.get('api_key_env', 'BINANCE_API_KEY') if account is not None else 'BINANCE_API_KEY'
+        secret_env = account.get('api_secret_env', 'BINANCE_API_SECRET') if account is not None else 'BINANCE_API_SECRET'
+        api_key = os.environ.get(key_env)
+        api_secret = os.environ.get(secret_env)
 
         if not api_key or not api_secret:
             self._log_and_raise("HATA: API anahtarları ortam değişkenlerinde bulunamadı.")
@@ -35,15 +58,34 @@ class TradingBot:
         self.is_testnet = self.config.getboolean('BINANCE', 'testnet', fallback=False)
         self.client = Client(api_key, api_secret, testnet=self.is_testnet)
 
+        trading = account if account is not None else self.config['TRADING']
         self.strategy_active: bool = False
-        self.active_symbol = self.config['TRADING']['symbol']
-        self.active_strategy_name = self.config['TRADING']['active_strategy']
-        self.quantity_usd = float(self.config['TRADING']['quantity_usd'])
-        self.leverage = int(self.config['TRADING']['leverage'])
+        self.active_symbol = trading.get('symbol', self.config['TRADING']['symbol'])
+        self.active_strategy_name = trading.get('active_strategy', self.config['TRADING']['active_strategy'])
+        self.quantity_usd = float(trading.get('quantity_usd', self.config['TRADING']['quantity_usd']))
+        self.leverage = int(trading.get('leverage', self.config['TRADING']['leverage']))
+
+        self.risk = RiskManager(self.client, self.config, self.active_strategy_name, log=self._log,
+                                quantity_usd=self.quantity_usd if account is not None else None)
+        self.trailing_stop = TrailingStopManager(
+            self.client,
+            trigger_roi=float(self.config['TRADING']['trailing_stop_pnl_trigger']),
+            distance_percent=float(self.config['TRADING']['trailing_stop_distance']),
+            log=self._log,
+            amend_interval=self.config.getfloat('TRADING', 'trailing_stop_amend_interval', fallback=2.0),
+            price_formatter=self.risk.format_price,
+            close_position=lambda symbol: self._close_position_and_log("İz süren stop konamadı")
+        )
 
         self.bm = BinanceSocketManager(self.client)
-        self.kline_socket = None
-        self.user_socket = None
+        ping_interval = self.config.getfloat('BINANCE', 'stream_ping_interval', fallback=0.5)
+        self.bm.ws_kwargs.update(ping_interval=ping_interval, ping_timeout=ping_interval)
+        self.market_data = MarketDataHub(self.client, log=self._log)
+        self.heartbeat_timeout = self.config.getfloat('BINANCE', 'stream_heartbeat_timeout', fallback=1.5)
+        self.listen_key: Optional[str] = None
+        self._background_jobs = set()
+        # Hiç kayıt yoksa kaçırılan işlemler bu andan itibaren aranır
+        self._created_at_ms = int(time.time() * 1000)
         self.loop = None
 
         self._log("WebSocket Uyumlu Bot objesi başarıyla oluşturuldu.")
@@ -77,31 +119,127 @@ class TradingBot:
         strategy_config = self.config[f"STRATEGY_{self.active_strategy_name}"]
         timeframe = strategy_config['timeframe']
 
-        self.kline_socket = self.bm.kline_socket(self.active_symbol, interval=timeframe)
-        self.user_socket = self.bm.user_socket()
-
-        async with self.kline_socket as k_stream, self.user_socket as u_stream:
-            while self.strategy_active:
-                try:
-                    kline_msg_task = asyncio.create_task(k_stream.recv())
-                    user_msg_task = asyncio.create_task(u_stream.recv())
-
-                    done, pending = await asyncio.wait(
-                        [kline_msg_task, user_msg_task],
-                        return_when=asyncio.FIRST_COMPLETED
-                    )
-
-                    for task in pending: task.cancel()
-
-                    if kline_msg_task in done:
-                        await self._process_kline_message(kline_msg_task.result())
-
-                    if user_msg_task in done:
-                        await self._process_user_message(user_msg_task.result())
-
-                except Exception as e:
-                    self._log(f"STREAM HATASI: {e}")
-                    await asyncio.sleep(5)
+        self.market_data = MarketDataHub(self.client, log=self._log)
+        self.market_data.subscribe(self.active_symbol, timeframe)
+        self.market_data.load_history()
+        self.risk.prepare(self.active_symbol, self.leverage)
+        self._track_existing_position()
+
+        market_supervisor = StreamSupervisor(
+            "PİYASA",
+            socket_factory=lambda: self.bm.futures_multiplex_socket(self.market_data.streams()),
+            handler=self._process_market_message,
+            is_active=lambda: self.strategy_active,
+            log=self._log,
+            heartbeat_timeout=self.heartbeat_timeout,
+            on_reconnect=self._backfill_market_data
+        )
+        await asyncio.gather(market_supervisor.run(), self.user_stream_supervisor(lambda: self.strategy_active).run())
+
+    def user_stream_supervisor(self, is_active: Callable[[], bool]) -> StreamSupervisor:
+        """Listen key'i zamanlayıcıyla yenileyen ve kopmada hesap durumunu eşitleyen kullanıcı akışı."""
+        return StreamSupervisor(
+            "KULLANICI",
+            socket_factory=self._open_user_socket,
+            handler=self._process_user_message,
+            is_active=is_active,
+            log=self._log,
+            prepare=self._fetch_listen_key,
+            keepalive=self._keepalive_listen_key,
+            on_reconnect=self._reconcile_account
+        )
+
+    def _fetch_listen_key(self):
+        # Aktif bir key varsa Binance aynı key'i döndürür ve süresini uzatır
+        self.listen_key = self.client.futures_stream_get_listen_key()
+
+    def _open_user_socket(self):
+        # Kullanıcı akışı 'private' kategorisinden yayınlanır; keepalive aynı key ile yapılır
+        return self.bm.futures_multiplex_socket([self.listen_key], category='private')
+
+    def _keepalive_listen_key(self):
+        if self.listen_key:
+            self.client.futures_stream_keepalive(listenKey=self.listen_key)
+
+    async def _backfill_market_data(self):
+        """
+        Kesinti sırasında kapanan mumları tamamlar. En son kapanan mum yalnızca bir
+        aralıktan daha yeniyse değerlendirilir; eski sinyallerle pozisyon açılmaz.
+        """
+        loop = asyncio.get_running_loop()
+        for symbol, timeframe in await loop.run_in_executor(None, self.market_data.backfill):
+            if not self.market_data.is_fresh(symbol, timeframe):
+                self._log(f"{symbol} için son kapanan mum bir aralıktan eski, sinyal değerlendirilmiyor.")
+                continue
+            df = self.market_data.frame(symbol, timeframe)
+            if df is None or df.empty: continue
+            signal, atr_value = self.get_active_strategy_signal(df)
+            await loop.run_in_executor(None, self.handle_signal, signal, atr_value, float(df['close'].iloc[-2]))
+
+    async def _reconcile_account(self):
+        await asyncio.get_running_loop().run_in_executor(None, self.reconcile_account)
+
+    def reconcile_account(self):
+        """
+        Kullanıcı akışı koptuğunda kaçırılmış olabilecek değişiklikleri REST ile eşitler:
+        kesinti sırasında kapanan işlemler kaydedilir, pozisyon takibi ve stop emri
+        borsadaki duruma göre güncellenir.
+        """
+        self._backfill_closed_trades()
+        position = self.get_position_info(self.active_symbol)
+        if not position or float(position.get('positionAmt', 0)) == 0:
+            tracked = self.trailing_stop.untrack(self.active_symbol)
+            if tracked and tracked.stop_order_id is not None:
+                self.trailing_stop.cancel_leftover_stop(self.active_symbol, tracked.stop_order_id)
+        elif not self.trailing_stop.is_tracking(self.active_symbol):
+            self._track_existing_position()
+        else:
+            try:
+                open_orders = self.client.futures_get_open_orders(symbol=self.active_symbol)
+                sl_order = next((o for o in open_orders if o['origType'] == 'STOP_MARKET'), None)
+                self.trailing_stop.sync_stop(
+                    self.active_symbol,
+                    float(sl_order['stopPrice']) if sl_order else None,
+                    sl_order['orderId'] if sl_order else None
+                )
+            except Exception as e:
+                self._log(f"HATA: Açık emirler eşitlenemedi: {e}")
+        if self.ui_update_callback: self.ui_update_callback()
+
+    def _backfill_closed_trades(self):
+        """Son kayıttan bu yana gerçekleşen, PnL üreten dolumları emir bazında veritabanına ekler."""
+        account = self.account_name or database.DEFAULT_ACCOUNT
+        last_time = database.get_last_trade_time(account) or self._created_at_ms
+        # Binance tek istekte en fazla 7 günlük aralık döndürür
+        start_time = max(last_time + 1, int(time.time() * 1000) - 7 * 24 * 3600 * 1000 + 60_000)
+        params = {'symbol': self.active_symbol, 'startTime': start_time}
+        try:
+            fills = self.client.futures_account_trades(**params)
+        except Exception as e:
+            self._log(f"HATA: Kaçırılan işlemler çekilemedi: {e}")
+            return
+        # Akıştan gelen kayıtlarla aynı şekilde emir numarasına göre birleştir
+        orders: Dict[int, Dict[str, Any]] = {}
+        for fill in fills:
+            pnl = float(fill.get('realizedPnl', 0))
+            if pnl == 0: continue
+            trade = orders.setdefault(fill['orderId'], {
+                'symbol': fill['symbol'], 'id': fill['orderId'], 'side': fill['side'],
+                'realizedPnl': 0.0, 'time': fill['time'], 'account': self.account_name
+            })
+            trade['realizedPnl'] += pnl
+            trade['time'] = max(trade['time'], fill['time'])
+        for trade in orders.values():
+            database.add_trade(trade)
+        if orders:
+            self._log(f"Kesinti sırasında kapanan {len(orders)} işlem kaydedildi.")
+
+    async def _process_market_message(self, msg: Dict[str, Any]):
+        data = msg.get('data', msg)
+        if data.get('e') == 'kline':
+            await self._process_kline_message(data)
+        elif data.get('e') == 'markPriceUpdate':
+            await self._process_mark_price_message(data)
 
     async def _process_kline_message(self, msg: Dict[str, Any]):
         if msg.get('e') == 'error':
@@ -109,19 +247,59 @@ class TradingBot:
             return
         if msg.get('k', {}).get('x'):
             self._log(f"Yeni mum kapandı: {self.active_symbol}")
-            df = self._get_market_data(self.active_symbol, msg['k']['i'])
+            df = self.market_data.on_closed_kline(msg['k'])
             if df is None or df.empty: return
             signal, atr_value = self.get_active_strategy_signal(df)
-            self._log(f"[{self.active_symbol}] Sinyal: {signal}")
-            open_positions = self.get_open_positions()
-            if not any(p['symbol'] == self.active_symbol for p in open_positions):
-                if signal == 'LONG': self._open_position('BUY', atr_value)
-                elif signal == 'SHORT': self._open_position('SELL', atr_value)
+            await asyncio.get_running_loop().run_in_executor(
+                None, self.handle_signal, signal, atr_value, float(msg['k']['c']))
+
+    def handle_signal(self, signal: str, atr_value: float, price: float):
+        """Hesaplanmış bir sinyali bu hesabın emir yoluna uygular."""
+        self._log(f"[{self.active_symbol}] Sinyal: {signal}")
+        if signal not in ('LONG', 'SHORT'): return
+        # Açık pozisyon durumu bellekte tutulur (ACCOUNT_UPDATE ve reconcile_account ile eşitlenir)
+        if not self.trailing_stop.is_tracking(self.active_symbol):
+            self._open_position('BUY' if signal == 'LONG' else 'SELL', atr_value, price)
+
+    async def _process_mark_price_message(self, msg: Dict[str, Any]):
+        data = msg.get('data', msg)
+        if data.get('e') == 'error':
+            self._log(f"MARK PRICE SOCKET HATASI: {data.get('m')}")
+            return
+        if data.get('e') != 'markPriceUpdate': return
+        self.trailing_stop.on_mark_price(data['s'], float(data['p']))
+        if self.trailing_stop.has_pending():
+            # REST çağrıları paylaşılan akışı bekletmesin diye flush beklenmeden executor'a verilir
+            self._run_in_background(self.trailing_stop.flush)
+
+    def _untrack_closed_position(self, symbol: str):
+        """Kapanan pozisyonu takipten çıkarır ve geride kalan stop emrini arka planda iptal eder."""
+        position = self.trailing_stop.untrack(symbol)
+        if position and position.stop_order_id is not None:
+            self._run_in_background(self.trailing_stop.cancel_leftover_stop, symbol, position.stop_order_id)
+
+    def _run_in_background(self, func: Callable, *args):
+        """Fonksiyonu beklemeden executor'da çalıştırır; oluşan hatalar loglanır."""
+        future = asyncio.get_running_loop().run_in_executor(None, func, *args)
+        self._background_jobs.add(future)
+        future.add_done_callback(self._on_background_done)
+        return future
+
+    def _on_background_done(self, future):
+        self._background_jobs.discard(future)
+        if future.cancelled(): return
+        error = future.exception()
+        if error is not None:
+            self._log(f"HATA: Arka plan işlemi başarısız: {error}")
 
     async def _process_user_message(self, msg: Dict[str, Any]):
+        msg = msg.get('data', msg)
         event_type = msg.get('e')
         if event_type == 'ACCOUNT_UPDATE':
             self._log("Hesap güncellemesi alındı, arayüz güncelleniyor.")
+            for pos in msg.get('a', {}).get('P', []):
+                if float(pos.get('pa', 0)) == 0:
+                    self._untrack_closed_position(pos.get('s'))
             if self.ui_update_callback: self.ui_update_callback()
 
         elif event_type == 'ORDER_TRADE_UPDATE':
@@ -138,72 +316,69 @@ class TradingBot:
                         'id': order_data.get('i'),
                         'side': order_data.get('S'),
                         'realizedPnl': order_data.get('rp'),
-                        'time': order_data.get('T')
+                        'time': order_data.get('T'),
+                        'account': self.account_name
                     }
                     database.add_trade(trade_to_log)
 
                 if self.ui_update_callback: self.ui_update_callback()
 
-    def _open_position(self, side: str, atr: float):
+    def _open_position(self, side: str, atr: float, price: float):
         try:
-            self.set_leverage(self.leverage)
-            quantity = self._calculate_quantity(self.active_symbol)
-            if quantity <= 0: return
-            self._log(f"POZİSYON AÇILIYOR: {side} {quantity} {self.active_symbol}")
-            self.client.futures_create_order(
-                symbol=self.active_symbol, side=side, type=ORDER_TYPE_MARKET, quantity=quantity
+            if not self.risk.prepare(self.active_symbol, self.leverage): return
+            plan = self.risk.plan(self.active_symbol, side, price, atr)
+            if plan is None:
+                self._log("UYARI: Risk planı oluşturulamadı, pozisyon açılmıyor.")
+                return
+            self._log(f"POZİSYON AÇILIYOR: {side} {plan.quantity} {self.active_symbol} | Marj: {plan.margin:.2f} USDT")
+            results = self.client.futures_create_batch_order(batchOrders=self.risk.build_batch_orders(plan))
+            entry_result, tp_result, sl_result = results
+            if 'orderId' not in entry_result:
+                self._log(f"HATA: Giriş emri reddedildi: {entry_result.get('msg')}")
+                self.client.futures_cancel_all_open_orders(symbol=self.active_symbol)
+                return
+            if 'orderId' not in tp_result:
+                self._log(f"UYARI: TP emri reddedildi: {tp_result.get('msg')}")
+            sl_price, sl_order_id = plan.sl_price, sl_result.get('orderId')
+            if sl_order_id is None:
+                self._log(f"UYARI: SL emri reddedildi: {sl_result.get('msg')}")
+                sl_price, sl_order_id = self._retry_stop_loss(plan)
+                if sl_order_id is None:
+                    self._close_position_and_log("SL konamadı")
+                    return
+            self._log(f"✅ TP ({self.risk.format_price(self.active_symbol, plan.tp_price)}) ve "
+                      f"SL ({self.risk.format_price(self.active_symbol, sl_price)}) emirleri ayarlandı.")
+            self.trailing_stop.track(
+                self.active_symbol, side, plan.entry_price, self.leverage,
+                sl_price, sl_order_id
             )
-            time.sleep(1)
-            self._set_tp_sl(side, atr)
             if self.ui_update_callback: self.ui_update_callback()
         except Exception as e:
             self._log(f"HATA: Pozisyon açılamadı: {e}")
 
-    def _set_tp_sl(self, side: str, atr: float):
+    def _retry_stop_loss(self, plan) -> tuple:
+        """
+        Reddedilen SL'yi gerçek giriş fiyatına göre aynı mesafede yeniden dener.
+        Mark fiyatı bu seviyeyi zaten geçtiyse veya emir yine reddedilirse (None, None) döner.
+        """
         try:
             position = self.get_position_info(self.active_symbol)
-            if not position: return
-            entry_price = float(position.get('entryPrice', 0))
-            if entry_price == 0:
-                self._log("UYARI: Giriş fiyatı alınamadı, TP/SL ayarlanamıyor.")
-                return
-
-            rm_mode = self.config['TRADING']['risk_management_mode']
-            strategy_config = self.config[f"STRATEGY_{self.active_strategy_name}"]
-            tp_price, sl_price = None, None
-
-            sl_multiplier = float(strategy_config['atr_multiplier_sl'])
-            tp_multiplier = float(strategy_config.get('atr_multiplier_tp', sl_multiplier * 2))
-
-            if side == 'BUY':
-                close_side = 'SELL'
-                sl_price = entry_price - (atr * sl_multiplier)
-                tp_price = entry_price + (atr * tp_multiplier)
-            else:
-                close_side = 'BUY'
-                sl_price = entry_price + (atr * sl_multiplier)
-                tp_price = entry_price - (atr * tp_multiplier)
-
-            batch_orders = []
-            if tp_price: batch_orders.append({
-                'symbol': self.active_symbol,
-                'side': close_side,
-                'type': 'TAKE_PROFIT_MARKET',
-                'stopPrice': f"{tp_price:.5f}",
-                'closePosition': True
-            })
-            if sl_price: batch_orders.append({
-                'symbol': self.active_symbol,
-                'side': close_side,
-                'type': 'STOP_MARKET',
-                'stopPrice': f"{sl_price:.5f}",
-                'closePosition': True
-            })
-            if batch_orders:
-                self.client.futures_create_batch_order(batchOrders=batch_orders)
-                self._log(f"✅ TP ({tp_price:.4f}) ve SL ({sl_price:.4f}) emirleri ayarlandı.")
+            if not position: return None, None
+            entry_price = float(position.get('entryPrice', 0)) or plan.entry_price
+            mark_price = float(position.get('markPrice', 0))
+            direction = 1 if plan.side == 'BUY' else -1
+            sl_price = self.risk.round_price(self.active_symbol, entry_price - (plan.entry_price - plan.sl_price))
+            if mark_price > 0 and (mark_price - sl_price) * direction <= 0:
+                self._log("UYARI: Mark fiyatı SL seviyesini geçmiş.")
+                return None, None
+            result = self.client.futures_create_order(
+                symbol=self.active_symbol, side=plan.close_side, type='STOP_MARKET',
+                stopPrice=self.risk.format_price(self.active_symbol, sl_price), closePosition=True
+            )
+            return sl_price, result['orderId']
         except Exception as e:
-            self._log(f"HATA: TP/SL ayarlanamadı: {e}")
+            self._log(f"HATA: SL yeniden konamadı: {e}")
+            return None, None
 
     def _close_position_and_log(self, reason: str):
         try:
@@ -214,6 +389,7 @@ class TradingBot:
             pos_amount = float(position.get('positionAmt', 0))
             if pos_amount == 0: return
             self.client.futures_cancel_all_open_orders(symbol=self.active_symbol)
+            self.trailing_stop.untrack(self.active_symbol)
             side = 'SELL' if pos_amount > 0 else 'BUY'
             self.client.futures_create_order(
                 symbol=self.active_symbol, side=side, type=ORDER_TYPE_MARKET, quantity=abs(pos_amount)
@@ -222,6 +398,26 @@ class TradingBot:
         except Exception as e:
             self._log(f"HATA: Pozisyon kapatılamadı: {e}")
 
+    def _track_existing_position(self):
+        """Bot başlarken zaten açık olan pozisyonu iz süren stop takibine alır."""
+        try:
+            position = self.get_position_info(self.active_symbol)
+            if not position: return
+            pos_amount = float(position.get('positionAmt', 0))
+            if pos_amount == 0: return
+            open_orders = self.client.futures_get_open_orders(symbol=self.active_symbol)
+            sl_order = next((o for o in open_orders if o['origType'] == 'STOP_MARKET'), None)
+            entry_price = float(position.get('entryPrice', 0))
+            self.trailing_stop.track(
+                self.active_symbol, 'BUY' if pos_amount > 0 else 'SELL', entry_price,
+                int(position.get('leverage', self.leverage)),
+                float(sl_order['stopPrice']) if sl_order else entry_price,
+                sl_order['orderId'] if sl_order else None
+            )
+            self._log(f"Mevcut pozisyon iz süren stop takibine alındı: {self.active_symbol}")
+        except Exception as e:
+            self._log(f"HATA: Mevcut pozisyon takibe alınamadı: {e}")
+
     def manual_trade(self, side: str):
         if self.strategy_active:
             self._log("Strateji çalışırken manuel işlem yapılamaz. Lütfen önce durdurun.")
@@ -229,7 +425,8 @@ class TradingBot:
         df = self._get_market_data(self.active_symbol, "1m", 20)
         if df is None: return
         latest_atr = ta.atr(df['high'], df['low'], df['close'], length=14).iloc[-1]
-        self._open_position('BUY' if side == 'LONG' else 'SELL', latest_atr if pd.notna(latest_atr) else 0)
+        self._open_position('BUY' if side == 'LONG' else 'SELL', latest_atr if pd.notna(latest_atr) else 0,
+                            float(df['close'].iloc[-1]))
 
     def close_current_position(self, manual: bool = False):
         self._close_position_and_log("Manuel kapatma" if manual else "Stratejik kapatma")
@@ -252,12 +449,14 @@ class TradingBot:
         self.leverage = leverage
         self.config.set('TRADING', 'leverage', str(leverage))
         with open('config.ini', 'w') as configfile: self.config.write(configfile)
+        self.risk.prepare(self.active_symbol, leverage)
         self._log(f"✅ Kaldıraç {leverage}x olarak ayarlandı.")
 
     def set_quantity(self, quantity_usd: float):
         self.quantity_usd = quantity_usd
         self.config.set('TRADING', 'quantity_usd', str(quantity_usd))
         with open('config.ini', 'w') as configfile: self.config.write(configfile)
+        self.risk.reload()
         self._log(f"✅ İşlem miktarı {quantity_usd} USD olarak ayarlandı.")
 
     def get_open_positions(self) -> List[Dict[str, Any]]:
@@ -304,10 +503,10 @@ class TradingBot:
             return None
 
     def get_stats_data(self) -> Dict[str, Any]:
-        return database.calculate_stats()
+        return database.calculate_stats(self.account_name or database.DEFAULT_ACCOUNT)
 
     def get_all_trades_data(self) -> List[tuple]:
-        return database.get_all_trades()
+        return database.get_all_trades(self.account_name or database.DEFAULT_ACCOUNT)
 
     def get_all_usdt_symbols(self) -> List[str]:
         try:
@@ -318,10 +517,7 @@ class TradingBot:
             return []
 
     def get_active_strategy_signal(self, df: pd.DataFrame) -> tuple:
-        if self.active_strategy_name.lower() == 'scalper':
-            return strategy_scalper.get_signal(df, self.config['STRATEGY_Scalper'])
-        else:
-            return strategy.get_signal(df, self.config['STRATEGY_KadirV2'])
+        return compute_signal(self.config, self.active_strategy_name, df)
 
     def _get_market_data(self, symbol: str, timeframe: str, limit: int = 200) -> Optional[pd.DataFrame]:
         try:
@@ -336,16 +532,6 @@ class TradingBot:
             self._log(f"HATA: Piyasa verileri çekilemedi ({symbol}): {e}")
             return None
 
-    def _calculate_quantity(self, symbol: str) -> float:
-        try:
-            ticker = self.client.futures_ticker(symbol=symbol)
-            price = float(ticker['lastPrice'])
-            if price <= 0: return 0.0
-            return round(self.quantity_usd / price, 4)
-        except Exception as e:
-            self._log(f"HATA: Miktar hesaplanamadı: {e}")
-            return 0.0
-
     def _load_config(self) -> configparser.ConfigParser:
         parser = configparser.ConfigParser()
         parser.read('config.ini', encoding='utf-8')
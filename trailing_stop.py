@@ -0,0 +1,281 @@
+import time
+import threading
+from dataclasses import dataclass
+from typing import Callable, Optional, Dict, List, Any
+
+# Binance tek bir batch isteğinde en fazla 5 emir kabul ediyor
+BATCH_ORDER_LIMIT = 5
+
+
+@dataclass
+class TrailedPosition:
+    """Takip edilen açık pozisyonun bellekteki durumu."""
+    symbol: str
+    side: str                      # Pozisyonu açan yön: 'BUY' (long) veya 'SELL' (short)
+    entry_price: float
+    leverage: int
+    stop_price: float
+    stop_order_id: Optional[int] = None
+    last_mark: float = 0.0
+    active: bool = False           # ROI tetikleyicisi geçildi mi?
+    last_amend: float = 0.0
+
+
+class TrailingStopManager:
+    """
+    Mark price akışından gelen her fiyat için açık pozisyonların ROI'sini hesaplayan
+    ve ROI tetikleyiciyi geçen pozisyonlarda stop seviyesini yalnızca kâr yönünde
+    kaydıran iz süren stop motoru.
+
+    Fiyat işleme (`on_mark_price`) tamamen bellekte yapılır, REST çağrısı yapmaz.
+    Borsadaki STOP_MARKET emirlerinin iptal/yeniden gönderimi `flush` içinde toplu
+    olarak yapılır ve hem global hem sembol bazında kısıtlanır.
+    """
+
+    def __init__(self, client, trigger_roi: float, distance_percent: float,
+                 log: Optional[Callable] = None,
+                 amend_interval: float = 2.0,
+                 flush_interval: float = 0.5,
+                 max_amends_per_flush: int = 10,
+                 price_formatter: Optional[Callable[[str, float], str]] = None,
+                 close_position: Optional[Callable[[str], None]] = None):
+        self.client = client
+        self.trigger_roi = trigger_roi
+        self.distance_percent = distance_percent
+        self.amend_interval = amend_interval
+        self.flush_interval = flush_interval
+        self.max_amends_per_flush = max_amends_per_flush
+        self._log = log if log else lambda msg: print(msg)
+        self._format_price = price_formatter if price_formatter else lambda symbol, price: f"{price:.5f}"
+        # Stop yeniden konamadığında pozisyonu piyasa emriyle kapatmak için
+        self._close_position = close_position
+
+        self.positions: Dict[str, TrailedPosition] = {}
+        self.pending: Dict[str, float] = {}
+        self._last_flush = 0.0
+        self._flushing = False
+        # track/untrack executor thread'lerinden, on_mark_price event loop'tan çağrılır
+        self._lock = threading.RLock()
+
+    def track(self, symbol: str, side: str, entry_price: float, leverage: int,
+              stop_price: float, stop_order_id: Optional[int] = None):
+        """Yeni açılan (veya başlangıçta bulunan) bir pozisyonu takibe alır."""
+        with self._lock:
+            self.positions[symbol] = TrailedPosition(
+                symbol=symbol, side=side, entry_price=entry_price, leverage=leverage,
+                stop_price=stop_price, stop_order_id=stop_order_id
+            )
+            self.pending.pop(symbol, None)
+
+    def untrack(self, symbol: str) -> Optional[TrailedPosition]:
+        """Kapanan pozisyonu takipten çıkarır, bekleyen güncellemeyi siler."""
+        with self._lock:
+            self.pending.pop(symbol, None)
+            return self.positions.pop(symbol, None)
+
+    def cancel_leftover_stop(self, symbol: str, order_id: int):
+        """Pozisyon kapandıktan sonra borsada kalan closePosition stop emrini iptal eder."""
+        try:
+            self.client.futures_cancel_order(symbol=symbol, orderId=order_id)
+            self._log(f"Kapanan pozisyondan kalan stop emri iptal edildi: {symbol}")
+        except Exception as e:
+            # Stop zaten tetiklenmiş ya da iptal edilmişse borsa hata döner
+            self._log(f"Kalan stop emri iptal edilemedi ({symbol}): {e}")
+
+    def is_tracking(self, symbol: str) -> bool:
+        return symbol in self.positions
+
+    def on_mark_price(self, symbol: str, mark_price: float) -> bool:
+        """
+        Tek bir mark price tikini işler. Stop seviyesi iyileşiyorsa yeni seviyeyi
+        bekleyen güncellemelere yazar (aynı sembol için önceki bekleyen değerin üzerine).
+
+        Returns:
+            bool: Yeni bir stop güncellemesi kuyruğa alındıysa True.
+        """
+        with self._lock:
+            position = self.positions.get(symbol)
+            if position is None or mark_price <= 0 or position.entry_price <= 0:
+                return False
+            position.last_mark = mark_price
+
+            direction = 1 if position.side == 'BUY' else -1
+            roi = (mark_price - position.entry_price) / position.entry_price * position.leverage * 100 * direction
+
+            if not position.active:
+                if roi < self.trigger_roi:
+                    return False
+                position.active = True
+                self._log(f"İZ SÜREN STOP AKTİF: {symbol} | ROI: %{roi:.2f}")
+
+            new_stop = mark_price * (1 - direction * self.distance_percent / 100)
+            current_stop = self.pending.get(symbol, position.stop_price)
+
+            # Stop yalnızca kâr yönünde ve en az bir fiyat adımı kadar kayar
+            if self._format_price(symbol, new_stop) == self._format_price(symbol, current_stop):
+                return False
+            if (new_stop - current_stop) * direction <= 0:
+                return False
+
+            self.pending[symbol] = new_stop
+            return True
+
+    def has_pending(self) -> bool:
+        return bool(self.pending)
+
+    def flush(self, now: Optional[float] = None) -> int:
+        """
+        Bekleyen stop güncellemelerini borsaya gönderir. Eski STOP_MARKET emirleri
+        iptal edilir, yenileri 5'erli batch isteklerle açılır.
+
+        Event loop dışında (executor'da) çağrılmak üzere tasarlanmıştır: REST çağrıları
+        kilit dışında yapılır, aynı anda yalnızca bir flush çalışır.
+
+        Returns:
+            int: Başarıyla güncellenen stop emri sayısı.
+        """
+        now = now if now is not None else time.monotonic()
+        with self._lock:
+            if not self.pending or self._flushing:
+                return 0
+            if now - self._last_flush < self.flush_interval:
+                return 0
+            ready = [
+                symbol for symbol in self.pending
+                if symbol in self.positions and now - self.positions[symbol].last_amend >= self.amend_interval
+            ][:self.max_amends_per_flush]
+            if not ready:
+                return 0
+            self._last_flush = now
+            self._flushing = True
+            # Gönderilecek değerlerin anlık görüntüsü; REST sırasında yeni tikler pending'i değiştirebilir
+            jobs = [(symbol, self.pending[symbol], self.positions[symbol].stop_order_id,
+                     self._build_stop_order(symbol, self.pending[symbol])) for symbol in ready]
+            for symbol in ready:
+                self.positions[symbol].stop_order_id = None
+
+        try:
+            cancelled = []
+            for job in jobs:
+                symbol, _, old_order_id, _ = job
+                if old_order_id is not None:
+                    try:
+                        self.client.futures_cancel_order(symbol=symbol, orderId=old_order_id)
+                    except Exception as e:
+                        # Eski stop tetiklenmiş olabilir (pozisyon kapalı); yeni stop gönderilmez,
+                        # eski emir geri yazılır ve güncelleme bir sonraki flush'ta tekrar denenir
+                        self._log(f"UYARI: Eski stop emri iptal edilemedi ({symbol}), güncelleme atlanıyor: {e}")
+                        with self._lock:
+                            if symbol in self.positions:
+                                self.positions[symbol].stop_order_id = old_order_id
+                                self.positions[symbol].last_amend = now
+                        continue
+                cancelled.append(job)
+            jobs = cancelled
+
+            amended = 0
+            failed = []
+            for i in range(0, len(jobs), BATCH_ORDER_LIMIT):
+                chunk = jobs[i:i + BATCH_ORDER_LIMIT]
+                try:
+                    results = self.client.futures_create_batch_order(batchOrders=[job[3] for job in chunk])
+                except Exception as e:
+                    self._log(f"HATA: İz süren stop emirleri gönderilemedi: {e}")
+                    results = [{'msg': str(e)}] * len(chunk)
+                for (symbol, sent_stop, _, _), result in zip(chunk, results):
+                    if self._apply_result(symbol, sent_stop, result, now):
+                        amended += 1
+                    else:
+                        failed.append((symbol, sent_stop))
+
+            for symbol, rejected in failed:
+                self._restore_stop(symbol, rejected)
+            return amended
+        finally:
+            with self._lock:
+                self._flushing = False
+
+    def _build_stop_order(self, symbol: str, stop_price: float) -> Dict[str, Any]:
+        close_side = 'SELL' if self.positions[symbol].side == 'BUY' else 'BUY'
+        return {
+            'symbol': symbol,
+            'side': close_side,
+            'type': 'STOP_MARKET',
+            'stopPrice': self._format_price(symbol, stop_price),
+            'closePosition': True
+        }
+
+    def _apply_result(self, symbol: str, sent_stop: float, result: Dict[str, Any], now: float) -> bool:
+        with self._lock:
+            position = self.positions.get(symbol)
+            if position is None:
+                return True
+            position.last_amend = now
+            # Gönderilen fiyat artık bekleyen değer değil; daha yeni bir tik geldiyse o korunur
+            if self.pending.get(symbol) == sent_stop:
+                self.pending.pop(symbol)
+            if 'orderId' not in result:
+                self._log(f"HATA: İz süren stop güncellenemedi ({symbol}): {result.get('msg')}")
+                return False
+            position.stop_price = sent_stop
+            position.stop_order_id = result['orderId']
+        self._log(f"🔒 İz süren stop güncellendi: {symbol} -> {self._format_price(symbol, sent_stop)}")
+        return True
+
+    def sync_stop(self, symbol: str, stop_price: Optional[float], stop_order_id: Optional[int]):
+        """
+        Borsadaki açık emirlerle bellekteki stop bilgisini eşitler. Borsada stop emri
+        yoksa son onaylı seviye yeniden konur (konamazsa pozisyon kapatılır).
+        """
+        with self._lock:
+            position = self.positions.get(symbol)
+            if position is None:
+                return
+            self.pending.pop(symbol, None)
+            if stop_order_id is not None:
+                position.stop_price = stop_price
+                position.stop_order_id = stop_order_id
+                return
+            position.stop_order_id = None
+            stop_price = position.stop_price
+        self._log(f"UYARI: Borsada stop emri bulunamadı ({symbol}), yeniden konuyor.")
+        self._restore_stop(symbol, stop_price)
+
+    def _restore_stop(self, symbol: str, rejected: float):
+        """
+        Reddedilen güncellemeden sonra son onaylı stop seviyesini yeniden koyar. Mark
+        fiyatı reddedilen seviyeyi zaten geçtiyse ya da stop konamıyorsa pozisyon
+        piyasa emriyle kapatılır; pozisyon hiçbir durumda korumasız bırakılmaz.
+        """
+        with self._lock:
+            position = self.positions.get(symbol)
+            if position is None:
+                return
+            direction = 1 if position.side == 'BUY' else -1
+            crossed = position.last_mark > 0 and (position.last_mark - rejected) * direction <= 0
+            stop_price = position.stop_price
+            order = self._build_stop_order(symbol, stop_price)
+
+        if crossed:
+            self._log(f"UYARI: Mark fiyatı stop seviyesini geçti ({symbol}), pozisyon kapatılıyor.")
+            self._close_untracked(symbol)
+            return
+        try:
+            result = self.client.futures_create_order(**order)
+        except Exception as e:
+            self._log(f"HATA: Önceki stop yeniden konamadı ({symbol}): {e}. Pozisyon kapatılıyor.")
+            self._close_untracked(symbol)
+            return
+        with self._lock:
+            if symbol in self.positions:
+                self.positions[symbol].stop_order_id = result['orderId']
+        self._log(f"Önceki stop yeniden kondu: {symbol} -> {self._format_price(symbol, stop_price)}")
+
+    def _close_untracked(self, symbol: str):
+        self.untrack(symbol)
+        if self._close_position:
+            self._close_position(symbol)
+
+    def tracked_symbols(self) -> List[str]:
+        with self._lock:
+            return list(self.positions)